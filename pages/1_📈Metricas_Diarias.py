@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from utils import render_export
+
+METRIC_COLUMNS = ['Publicaciones', 'Contactos', 'Citas', 'Entrevistas', 'Aceptados']
 
 # --- INICIO: Función de carga (copiar a utils.py o mantener aquí) ---
 @st.cache_data(ttl=43200)
@@ -16,8 +20,7 @@ def load_data_from_airtable():
         all_records = table.all()
         df = pd.DataFrame([record['fields'] for record in all_records])
         df['Fecha'] = pd.to_datetime(df['Fecha'], errors='coerce')
-        metric_columns = ['Publicaciones', 'Contactos', 'Citas', 'Entrevistas', 'Aceptados']
-        for col in metric_columns:
+        for col in METRIC_COLUMNS:
             df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
         if 'Reclutador' in df.columns:
             df['Reclutador'] = df['Reclutador'].str.strip()
@@ -34,6 +37,79 @@ def get_thursday_week_range(date_obj):
     start_of_week = date_obj - timedelta(days=days_since_thursday)
     return start_of_week
 
+BASELINE_QUANTILES = (0.25, 0.5, 0.75)
+BASELINE_TRAILING_WEEKS = 8
+BASELINE_WINDOW_LABELS = {
+    'historico': "Histórico",
+    'recientes': f"Últimas {BASELINE_TRAILING_WEEKS} semanas",
+}
+# Nombres de los días indexados por weekday() (0=Lunes ... 6=Domingo), sin depender del locale
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+def _weekday_stats(frame, recruiters):
+    """Promedios y cuantiles por día de la semana de los totales diarios, para toda la organización y por reclutador."""
+    n_rec, n_q, n_met = len(recruiters), len(BASELINE_QUANTILES), len(METRIC_COLUMNS)
+    quantiles = list(BASELINE_QUANTILES)
+    values = frame[METRIC_COLUMNS]
+    days = frame['Fecha'].dt.normalize().rename('Dia')
+
+    # Totales por día (organización) y por (reclutador, día); los días sin actividad cuentan como 0,
+    # para cada reclutador solo entre su primer y su último día con registros
+    calendar = pd.date_range(days.min(), days.max(), freq='D', name='Dia')
+    org_daily = values.groupby(days).sum().reindex(calendar, fill_value=0)
+    rec_daily = values.groupby([frame['Reclutador'], days]).sum()
+    if not rec_daily.empty:
+        rec_daily = pd.concat({
+            name: group.droplevel('Reclutador').reindex(
+                pd.date_range(group.index.get_level_values('Dia').min(), group.index.get_level_values('Dia').max(), freq='D', name='Dia'),
+                fill_value=0
+            )
+            for name, group in rec_daily.groupby(level='Reclutador')
+        }, names=['Reclutador'])
+
+    org = org_daily.groupby(org_daily.index.weekday)
+    org_q_index = pd.MultiIndex.from_product([range(7), quantiles])
+    rec = rec_daily.groupby([
+        rec_daily.index.get_level_values('Reclutador'),
+        rec_daily.index.get_level_values('Dia').weekday,
+    ])
+    rec_index = pd.MultiIndex.from_product([recruiters, range(7)])
+    rec_q_index = pd.MultiIndex.from_product([recruiters, range(7), quantiles])
+
+    # Los días de la semana fuera del rango de fechas quedan como NaN y se tratan como 0 en la consulta
+    return {
+        'org_mean': org.mean().reindex(range(7)).to_numpy(),
+        'org_q': org.quantile(quantiles).reindex(org_q_index).to_numpy().reshape(7, n_q, n_met),
+        'rec_mean': rec.mean().reindex(rec_index).to_numpy().reshape(n_rec, 7, n_met),
+        'rec_q': rec.quantile(quantiles).reindex(rec_q_index).to_numpy().reshape(n_rec, 7, n_q, n_met),
+    }
+
+@st.cache_data(ttl=43200)
+def build_weekday_baseline(_df, data_version, trailing_weeks=BASELINE_TRAILING_WEEKS):
+    """Construye una vez por versión de datos el índice de referencia por día de la semana.
+
+    El DataFrame no se hashea; el caché se identifica solo por `data_version`.
+    Devuelve arreglos indexados por [reclutador, weekday, cuantil, métrica] para todo el
+    histórico ('historico') y para las últimas `trailing_weeks` semanas ('recientes').
+    """
+    recruiters = sorted(_df['Reclutador'].dropna().unique())
+    cutoff = _df['Fecha'].max() - pd.Timedelta(weeks=trailing_weeks)
+    return {
+        'recruiters': {name: i for i, name in enumerate(recruiters)},
+        'historico': _weekday_stats(_df, recruiters),
+        'recientes': _weekday_stats(_df[_df['Fecha'] > cutoff], recruiters),
+    }
+
+def lookup_weekday_baseline(baseline, weekday, recruiter="Todos", window='historico'):
+    """Regresa (promedios, cuantiles) del día de la semana para el reclutador o para toda la organización."""
+    stats = baseline[window]
+    idx = baseline['recruiters'].get(recruiter)
+    if idx is None:
+        mean, quant = stats['org_mean'][weekday], stats['org_q'][weekday]
+    else:
+        mean, quant = stats['rec_mean'][idx, weekday], stats['rec_q'][idx, weekday]
+    return np.nan_to_num(mean), np.nan_to_num(quant)
+
 # --- CONFIGURACIÓN DE LA PÁGINA ---
 st.set_page_config(page_title="Métricas de Reclutamiento", page_icon="📈", layout="wide")
 st.title("📈 Métricas y Desempeño")
@@ -48,13 +124,7 @@ if not df.empty:
     
     df_filtered = df if selected_recruiter == "Todos" else df[df['Reclutador'] == selected_recruiter].copy()
 
-    metric_labels = {
-        'Publicaciones': 'Publicaciones', 
-        'Contactos': 'Contactados', 
-        'Citas': 'Citados', 
-        'Entrevistas': 'Entrevistados', 
-        'Aceptados': 'Aceptados'
-    }
+    metric_labels = dict(zip(METRIC_COLUMNS, ['Publicaciones', 'Contactados', 'Citados', 'Entrevistados', 'Aceptados']))
 
     # --- CREACIÓN DE PESTAÑAS ---
     tab_daily, tab_weekly, tab_monthly, tab_sunday = st.tabs(["Diario", "Semanal", "Mensual", "Análisis de Domingos"])
@@ -64,9 +134,14 @@ if not df.empty:
         st.header("Métricas del Día")
         selected_date_daily = st.date_input("Selecciona un día", datetime.now().date(), key="daily_date_selector")
         
-        # Calcular promedios históricos por día de la semana
-        df['DiaSemana'] = df['Fecha'].dt.day_name()
-        daily_avg = df.groupby('DiaSemana')[list(metric_labels.keys())].mean()
+        baseline_window = st.radio(
+            "Promedio de referencia",
+            options=['historico', 'recientes'],
+            format_func=BASELINE_WINDOW_LABELS.get,
+            horizontal=True,
+            key="daily_baseline_window"
+        )
+        weekday_baseline = build_weekday_baseline(df, data_version=pd.util.hash_pandas_object(df[['Fecha', 'Reclutador', *METRIC_COLUMNS]], index=False).sum())
         
         daily_data = df_filtered[df_filtered['Fecha'].dt.date == selected_date_daily]
         
@@ -76,29 +151,24 @@ if not df.empty:
             daily_summary = daily_data.sum(numeric_only=True)
             
             # --- 1. INDICADORES KPI CON COMPARATIVA ---
-            st.subheader("Rendimiento vs Promedio Histórico")
-            day_name = selected_date_daily.strftime('%A')
-            # Mapeo de nombres de día de la semana de español a inglés para lookup
-            day_map_es_en = {
-                'Monday': 'Lunes', 'Tuesday': 'Martes', 'Wednesday': 'Miércoles', 
-                'Thursday': 'Jueves', 'Friday': 'Viernes', 'Saturday': 'Sábado', 'Sunday': 'Domingo'
-            }
-            # strftime('%A') puede devolver nombres en el locale del sistema (español)
-            # Hacemos una búsqueda para encontrar la clave en inglés
-            day_name_en = next((en for en, es in day_map_es_en.items() if es.lower() == day_name.lower()), day_name)
-
+            window_label = BASELINE_WINDOW_LABELS[baseline_window]
+            st.subheader(f"Rendimiento vs Promedio ({window_label})")
+            weekday = selected_date_daily.weekday()
+            day_name = DIAS_SEMANA[weekday]
+            avg_values, quantile_values = lookup_weekday_baseline(weekday_baseline, weekday, selected_recruiter, baseline_window)
+            q_low, q_high = quantile_values[0], quantile_values[-1]
 
             cols = st.columns(len(metric_labels))
             for i, (metric, label) in enumerate(metric_labels.items()):
                 with cols[i]:
                     value = daily_summary.get(metric, 0)
-                    avg_value = daily_avg.loc[day_name_en, metric] if day_name_en in daily_avg.index else 0
+                    avg_value = avg_values[i]
                     delta = f"{(value - avg_value):.1f}" if avg_value > 0 else None
                     st.metric(
                         label=label, 
                         value=f"{int(value)}",
                         delta=delta,
-                        help=f"El promedio histórico para los {day_name} es {avg_value:.1f}"
+                        help=f"El promedio ({window_label.lower()}) para los {day_name} es {avg_value:.1f} (rango típico {q_low[i]:.1f} – {q_high[i]:.1f})"
                     )
             
             st.divider()
@@ -153,6 +223,12 @@ if not df.empty:
             else:
                 st.dataframe(summary_table, use_container_width=True)
 
+            render_export(
+                {"Registros": daily_data, "Resumen por reclutador": summary_table.reset_index()},
+                file_stem=f"diario_{selected_date_daily.strftime('%Y%m%d')}",
+                key="daily_export"
+            )
+
 
     # --- PESTAÑA SEMANAL ---
     with tab_weekly:
@@ -196,6 +272,12 @@ if not df.empty:
                     fig.update_layout(title=f"Acumulado de {label}", height=300, margin=dict(l=20, r=20, t=40, b=20), xaxis_title=None, yaxis_title="Total")
                     st.plotly_chart(fig, use_container_width=True, key=f"weekly_kpi_{metric}")
 
+        render_export(
+            {"Registros de la semana": weekly_data, "Totales por semana": weekly_kpis.reset_index()},
+            file_stem=f"semanal_{start_of_week.strftime('%Y%m%d')}",
+            key="weekly_export"
+        )
+
     # --- PESTAÑA MENSUAL ---
     with tab_monthly:
         st.header("Análisis Mensual")
@@ -236,6 +318,12 @@ if not df.empty:
                     fig.update_layout(title=f"Acumulado de {label}", height=300, margin=dict(l=20, r=20, t=40, b=20), xaxis_title=None, yaxis_title="Total")
                     st.plotly_chart(fig, use_container_width=True, key=f"monthly_kpi_{metric}")
 
+        render_export(
+            {"Registros del mes": monthly_data, "Totales por mes": monthly_kpis.reset_index()},
+            file_stem=f"mensual_{selected_month}",
+            key="monthly_export"
+        )
+
     # --- PESTAÑA DE DOMINGOS ---
     with tab_sunday:
         st.header("Análisis de Publicaciones en Domingo")
@@ -5,6 +5,7 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from pyairtable import Api
 import numpy as np
+from utils import render_export
 
 st.set_page_config(
     page_title="Comparativa entre equipos",
@@ -117,6 +118,15 @@ if not df.empty:
         fig.update_layout(title=f"Total de {metric_to_compare} por Equipo", xaxis_title="Equipos", yaxis_title=f"Total de {metric_to_compare}", height=500)
         st.plotly_chart(fig, use_container_width=True)
 
+        team_members = {member: name for name, data in TEAMS_CONFIG.items() for member in data['members']}
+        member_results = comparison_df.groupby('Reclutador')[['Publicaciones', 'Contactos', 'Citas', 'Entrevistas', 'Aceptados']].sum().reset_index()
+        member_results.insert(0, 'Equipo', member_results['Reclutador'].map(team_members))
+        render_export(
+            {"Registros del periodo": comparison_df, "Totales por equipo": results_df, "Totales por reclutador": member_results},
+            file_stem=f"comparativa_{metric_to_compare.lower()}",
+            key="comparison_export"
+        )
+
         st.divider()
         
         # Graficar por equipo a chuparla 
@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from utils import render_export
 
 # Se asume una función de carga en utils.py
 # from utils import load_data_from_airtable 
@@ -106,6 +107,12 @@ if not df.empty:
             results_df = pd.DataFrame(results_list).set_index("Reclutador")
             st.dataframe(results_df, use_container_width=True)
 
+        render_export(
+            {"Registros del periodo": period_df, "Totales por reclutador": grouped_data.reset_index()},
+            file_stem=f"desempeno_{analysis_period.lower()}_{target_date.strftime('%Y%m%d')}",
+            key="performance_export"
+        )
+
         # --- SECCIÓN DE GRÁFICOS DE RADAR (SOLO PARA VISTA SEMANAL) ---
         if analysis_period == "Semana":
             st.divider()
@@ -0,0 +1,89 @@
+import io
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Número de filas que se serializan por bloque al exportar
+EXPORT_CHUNK_ROWS = 50_000
+
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+def iter_csv_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Genera el CSV por bloques de filas, con el encabezado solo en el primero."""
+    if df.empty:
+        yield df.to_csv(index=False).encode('utf-8')
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=(start == 0)).encode('utf-8')
+
+def write_csv(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Escribe el DataFrame como CSV en un buffer, bloque por bloque."""
+    buffer = io.BytesIO()
+    for chunk in iter_csv_chunks(df, chunk_rows):
+        buffer.write(chunk)
+    buffer.seek(0)
+    return buffer
+
+def _to_text(value):
+    """Convierte un valor a texto, conservando los nulos."""
+    if value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return str(value)
+
+def write_parquet(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Escribe el DataFrame como Parquet en un buffer, un row group por bloque.
+
+    Las columnas de tipo object con valores mixtos (p. ej. campos de fórmula o lookup de
+    Airtable) se exportan como texto, ya que Parquet requiere un solo tipo por columna.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    text_columns = [
+        col for col in df.columns
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed')
+    ]
+    base_schema = pa.Schema.from_pandas(df.drop(columns=text_columns), preserve_index=False)
+    schema = pa.schema([
+        pa.field(col, pa.string()) if col in text_columns else base_schema.field(col)
+        for col in df.columns
+    ])
+    buffer = io.BytesIO()
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            if text_columns:
+                chunk = chunk.assign(**{col: chunk[col].map(_to_text) for col in text_columns})
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    buffer.seek(0)
+    return buffer
+
+def render_export(datasets, file_stem, key):
+    """Muestra los controles para descargar alguno de los DataFrames en `datasets` (nombre -> DataFrame).
+
+    El archivo se genera solo cuando se presiona el botón de descarga.
+    """
+    with st.expander("⬇️ Descargar datos"):
+        col1, col2 = st.columns(2)
+        with col1:
+            dataset_name = st.selectbox("Datos a descargar", options=list(datasets.keys()), key=f"{key}_dataset")
+        with col2:
+            export_format = st.radio("Formato", options=list(EXPORT_FORMATS.keys()), horizontal=True, key=f"{key}_format")
+
+        data = datasets[dataset_name]
+        extension, mime = EXPORT_FORMATS[export_format]
+        writer = write_csv if export_format == "CSV" else write_parquet
+        suffix = dataset_name.lower().replace(' ', '_')
+        st.caption(f"{len(data):,} filas")
+        st.download_button(
+            label=f"Descargar {export_format}",
+            data=partial(writer, data),
+            file_name=f"{file_stem}_{suffix}.{extension}",
+            mime=mime,
+            disabled=data.empty,
+            key=f"{key}_download"
+        )